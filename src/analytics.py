@@ -0,0 +1,298 @@
+"""
+analytics.py
+------------
+
+Statistiques de difficulté des puzzles du jeu du cavalier.
+
+Pour chaque puzzle de la base, on calcule en un seul parcours en largeur
+depuis le cavalier :
+- la longueur du chemin optimal vers le pion noir le plus proche,
+- le nombre de chemins optimaux distincts,
+- le facteur de branchement moyen (nombre moyen de coups possibles
+  sur les cases accessibles),
+- le nombre d'impasses (cases accessibles, hors cibles, offrant au plus
+  un coup),
+- la taille de la région accessible.
+
+Les résultats sont mis en cache dans un fichier JSON, indexés par une
+empreinte du contenu du puzzle : un puzzle inchangé n'est jamais recalculé.
+
+Usage:
+    python -m src.analytics [puzzles.json] [--sort COLONNE] [--reverse]
+"""
+
+from collections import deque
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from .engine import Engine, puzzle_moves
+
+# À incrémenter si la définition des métriques change (invalide le cache)
+METRICS_VERSION = 2
+
+# Métriques calculées pour chaque puzzle
+METRICS = ('optimal_length', 'optimal_paths', 'branching', 'dead_ends', 'reachable')
+
+# Colonnes du tableau : (clé, en-tête, largeur)
+COLUMNS = [
+    ('level', 'Niveau', 7),
+    ('size', 'Taille', 7),
+    ('optimal_length', 'Optimal', 8),
+    ('optimal_paths', 'Chemins', 9),
+    ('branching', 'Branch.', 8),
+    ('dead_ends', 'Impasses', 9),
+    ('reachable', 'Région', 7),
+]
+
+# En dessous de ce nombre de puzzles à calculer, on évite le coût de
+# démarrage des processus
+PARALLEL_THRESHOLD = 64
+
+
+def puzzle_hash(puzzle: dict) -> str:
+    """
+    Calcule l'empreinte du contenu d'un puzzle.
+
+    La sérialisation est canonique (clés triées, sans espaces) de sorte que
+    la mise en forme du fichier JSON n'influe pas sur l'empreinte.
+    """
+    content = json.dumps(puzzle, sort_keys=True, separators=(',', ':'))
+    data = f"{METRICS_VERSION}:{content}".encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def analyse_puzzle(puzzle: dict) -> dict:
+    """
+    Calcule les métriques de difficulté d'un puzzle.
+
+    Args:
+        puzzle: Puzzle au format de puzzles.json
+
+    Returns:
+        Dictionnaire des métriques (optimal_length vaut None si le puzzle
+        n'a pas de solution)
+    
+    Raises:
+        ValueError: Si la clé "leapers" du puzzle est mal formée
+    """
+    engine = Engine(puzzle["width"], puzzle["height"], puzzle_moves(puzzle))
+    for row, col, piece in puzzle["pieces"]:
+        engine.set_piece(row, col, piece)
+
+    metrics = {
+        'optimal_length': None,
+        'optimal_paths': 0,
+        'branching': 0.0,
+        'dead_ends': 0,
+        'reachable': 0,
+    }
+    start = engine.knight_pos
+    if start is None:
+        return metrics
+
+    targets = set(engine.target_positions)
+
+    # Après le premier coup, la case de départ est libre : elle ne doit pas
+    # retirer d'issue aux cases voisines
+    engine.set_piece(start[0], start[1], '.')
+
+    # BFS complet : distances, nombre de plus courts chemins et degrés
+    distance = {start: 0}
+    paths = {start: 1}
+    total_moves = 0
+    queue = deque([start])
+
+    while queue:
+        current_pos = queue.popleft()
+        moves = engine.get_possible_moves(current_pos)
+        total_moves += len(moves)
+
+        if len(moves) <= 1 and current_pos not in targets:
+            metrics['dead_ends'] += 1
+
+        next_distance = distance[current_pos] + 1
+        for next_pos in moves:
+            if next_pos not in distance:
+                distance[next_pos] = next_distance
+                paths[next_pos] = paths[current_pos]
+                queue.append(next_pos)
+            elif distance[next_pos] == next_distance:
+                paths[next_pos] += paths[current_pos]
+
+    reached = [pos for pos in targets if pos in distance]
+    if reached:
+        best = min(distance[pos] for pos in reached)
+        metrics['optimal_length'] = best
+        metrics['optimal_paths'] = sum(paths[pos] for pos in reached
+                                       if distance[pos] == best)
+
+    metrics['reachable'] = len(distance)
+    metrics['branching'] = round(total_moves / len(distance), 3)
+    return metrics
+
+
+def load_cache(filename: Path) -> Dict[str, dict]:
+    """Charge le cache des résultats (vide s'il est absent ou illisible)."""
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != METRICS_VERSION:
+        return {}
+    results = data.get('results')
+    if not isinstance(results, dict):
+        return {}
+    # Les entrées incomplètes ou mal formées seront recalculées
+    return {key: value for key, value in results.items()
+            if isinstance(value, dict) and all(name in value for name in METRICS)}
+
+
+def save_cache(filename: Path, results: Dict[str, dict]):
+    """Enregistre le cache des résultats."""
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({'version': METRICS_VERSION, 'results': results}, f,
+                  separators=(',', ':'))
+
+
+def analyse_puzzles(puzzles: List[dict], cache: Dict[str, dict],
+                    jobs: Optional[int] = None) -> List[dict]:
+    """
+    Calcule les métriques de tous les puzzles en réutilisant le cache.
+
+    Seuls les puzzles absents du cache sont calculés, en parallèle sur
+    plusieurs processus. Le cache est mis à jour sur place et ne conserve
+    que les puzzles de la base, pour ne pas grossir indéfiniment.
+
+    Args:
+        puzzles: Liste des puzzles
+        cache: Résultats déjà connus, indexés par empreinte
+        jobs: Nombre de processus (par défaut: nombre de processeurs)
+
+    Returns:
+        Liste des métriques, dans l'ordre des puzzles
+    
+    Raises:
+        ValueError: Si un puzzle à calculer a une clé "leapers" mal formée
+    """
+    keys = [puzzle_hash(puzzle) for puzzle in puzzles]
+
+    # Puzzles à calculer (une seule fois par empreinte)
+    todo = {}
+    for level, (key, puzzle) in enumerate(zip(keys, puzzles), start=1):
+        if key not in cache and key not in todo:
+            # Valider la pièce ici pour pouvoir désigner le niveau fautif
+            try:
+                puzzle_moves(puzzle)
+            except ValueError as e:
+                raise ValueError(f"Niveau {level}: {e}") from e
+            todo[key] = puzzle
+
+    if todo:
+        jobs = jobs or os.cpu_count() or 1
+        pending = list(todo.values())
+        if jobs > 1 and len(pending) >= PARALLEL_THRESHOLD:
+            chunksize = max(1, len(pending) // (jobs * 8))
+            with Pool(jobs) as pool:
+                computed = pool.map(analyse_puzzle, pending, chunksize)
+        else:
+            computed = [analyse_puzzle(puzzle) for puzzle in pending]
+        cache.update(zip(todo.keys(), computed))
+
+    # Oublier les puzzles modifiés ou retirés de la base
+    current = set(keys)
+    for key in [key for key in cache if key not in current]:
+        del cache[key]
+
+    results = []
+    for level, (key, puzzle) in enumerate(zip(keys, puzzles), start=1):
+        row = dict(cache[key])
+        row['level'] = level
+        row['size'] = f"{puzzle['width']}x{puzzle['height']}"
+        results.append(row)
+    return results
+
+
+def format_table(results: List[dict], sort_key: str = 'level',
+                 reverse: bool = False) -> str:
+    """
+    Met en forme les métriques sous forme de tableau trié.
+
+    Les puzzles sans solution sont toujours placés en fin de tableau
+    lors d'un tri sur la longueur optimale.
+    """
+    def key(row):
+        value = row[sort_key]
+        if sort_key == 'size':
+            return (False, tuple(int(v) for v in value.split('x')))
+        return (value is None, value if value is not None else 0)
+
+    rows = sorted(results, key=key, reverse=reverse)
+    if reverse:
+        # Garder les valeurs manquantes en fin de tableau
+        rows.sort(key=lambda row: row[sort_key] is None)
+
+    lines = [" ".join(f"{title:>{width}}" for _, title, width in COLUMNS)]
+    lines.append(" ".join("-" * width for _, _, width in COLUMNS))
+    for row in rows:
+        cells = []
+        for name, _, width in COLUMNS:
+            value = row[name]
+            cells.append(f"{'-' if value is None else value:>{width}}")
+        lines.append(" ".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    default_db = Path(__file__).parent.parent / "assets" / "puzzles" / "puzzles.json"
+
+    parser = argparse.ArgumentParser(
+        description="Statistiques de difficulté des puzzles du jeu du cavalier")
+    parser.add_argument('puzzles', nargs='?', type=Path, default=default_db,
+                        help="base de puzzles (défaut: %(default)s)")
+    parser.add_argument('--cache', type=Path, default=None,
+                        help="fichier cache (défaut: <puzzles>.analytics.json)")
+    parser.add_argument('--sort', default='level',
+                        choices=[name for name, _, _ in COLUMNS],
+                        help="colonne de tri (défaut: %(default)s)")
+    parser.add_argument('--reverse', action='store_true',
+                        help="tri décroissant")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="nombre de processus (défaut: nombre de processeurs)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.puzzles, 'r', encoding='utf-8') as f:
+            puzzles = json.load(f).get('puzzles', [])
+    except (json.JSONDecodeError, FileNotFoundError, PermissionError) as e:
+        print(f"Erreur lors du chargement des puzzles: {e}", file=sys.stderr)
+        return 1
+
+    cache_file = args.cache or args.puzzles.with_suffix('.analytics.json')
+    cache = load_cache(cache_file)
+    known = set(cache)
+
+    try:
+        results = analyse_puzzles(puzzles, cache, args.jobs)
+    except ValueError as e:
+        print(f"Puzzle invalide: {e}", file=sys.stderr)
+        return 1
+    if set(cache) != known:
+        try:
+            save_cache(cache_file, cache)
+        except OSError as e:
+            # Le cache n'est qu'une optimisation : on affiche quand même le tableau
+            print(f"Impossible d'enregistrer le cache: {e}", file=sys.stderr)
+
+    print(format_table(results, args.sort, args.reverse))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,241 @@
 from collections import deque
-from typing import List, Tuple, Optional, Set
-import copy
+from functools import lru_cache
+from typing import Iterable, List, Tuple, Optional, Set
+import struct
+
+# Sauteurs usuels (a, b) : déplacement de a cases dans un sens et b dans l'autre
+KNIGHT = (1, 2)
+CAMEL = (1, 3)
+ZEBRA = (2, 3)
+
+
+def leaper_moves(*leapers: Tuple[int, int]) -> Tuple[Tuple[int, int], ...]:
+    """
+    Construit l'ensemble des déplacements d'un sauteur (éventuellement composé).
+
+    Chaque sauteur (a, b) donne les déplacements (±a, ±b) et (±b, ±a).
+
+    Args:
+        leapers: Sauteurs (a, b) à combiner (au moins un)
+
+    Returns:
+        Déplacements (dr, dc) triés, sans doublon
+    
+    Raises:
+        ValueError: Si aucun sauteur n'est donné ou si un sauteur n'est pas
+            un couple d'entiers
+    """
+    if not leapers:
+        raise ValueError("Aucun sauteur donné")
+    moves = set()
+    for leaper in leapers:
+        if (not isinstance(leaper, (list, tuple)) or len(leaper) != 2
+                or not all(isinstance(v, int) and not isinstance(v, bool) for v in leaper)):
+            raise ValueError(f"Sauteur invalide (couple d'entiers attendu): {leaper!r}")
+        a, b = leaper
+        for dr, dc in ((a, b), (b, a)):
+            for sr in (-1, 1):
+                for sc in (-1, 1):
+                    moves.add((sr * dr, sc * dc))
+    moves.discard((0, 0))
+    return tuple(sorted(moves))
+
+
+KNIGHT_MOVES = leaper_moves(KNIGHT)
+
+
+def puzzle_moves(puzzle: dict) -> Tuple[Tuple[int, int], ...]:
+    """
+    Retourne les déplacements de la pièce d'un puzzle de puzzles.json.
+    
+    La clé optionnelle "leapers" est une liste de sauteurs [[a, b], ...] ;
+    en son absence, la pièce est le cavalier.
+    
+    Raises:
+        ValueError: Si la clé "leapers" est mal formée
+    """
+    leapers = puzzle.get("leapers", [KNIGHT])
+    if not isinstance(leapers, list) or not leapers:
+        raise ValueError(f"Clé 'leapers' invalide (liste non vide attendue): {leapers!r}")
+    return leaper_moves(*leapers)
+
+# Codes des pièces sur l'échiquier (un octet ASCII par case)
+EMPTY = ord('.')
+KNIGHT_PIECE = ord('K')
+OBSTACLE = ord('P')
+TARGET = ord('p')
+
+# Pièces acceptées par Engine.set_piece et BoardSnapshot.from_pieces
+PIECES = ('K', 'P', 'p', '.')
+
+
+@lru_cache(maxsize=None)
+def compile_move_table(width: int, height: int,
+                       moves: Tuple[Tuple[int, int], ...]) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Précalcule la table des voisins pour une taille d'échiquier et un jeu de
+    déplacements donnés.
+
+    La table est partagée entre tous les moteurs de même configuration.
+
+    Returns:
+        Pour chaque case d'indice row * width + col, les indices des cases
+        atteignables dans l'échiquier (dans l'ordre de moves)
+    """
+    table = []
+    for row in range(height):
+        for col in range(width):
+            table.append(tuple((row + dr) * width + col + dc for dr, dc in moves
+                               if 0 <= row + dr < height and 0 <= col + dc < width))
+    return tuple(table)
+
+
+class BoardSnapshot:
+    """
+    Instantané immuable et hachable d'un échiquier.
+    
+    L'instantané tient dans un unique objet bytes : un en-tête (largeur,
+    hauteur, indice du cavalier) suivi d'un octet par case. Deux
+    instantanés sont égaux si et seulement si leurs échiquiers le sont.
+    """
+    
+    __slots__ = ('_data',)
+    
+    # Largeur, hauteur et indice du cavalier (NO_KNIGHT s'il est absent),
+    # sur 32 bits ; NO_KNIGHT est hors de portée de tout indice de case
+    HEADER = struct.Struct('>III')
+    NO_KNIGHT = 0xFFFFFFFF
+    
+    def __init__(self, data: bytes):
+        """
+        Args:
+            data: Contenu brut (en-tête suivi des cases)
+        
+        Raises:
+            ValueError: Si le contenu est incohérent (taille, position du cavalier)
+        """
+        data = bytes(data)
+        if len(data) < self.HEADER.size:
+            raise ValueError("Instantané tronqué")
+        width, height, knight = self.HEADER.unpack_from(data)
+        area = width * height
+        if area >= self.NO_KNIGHT:
+            raise ValueError(f"Échiquier trop grand pour un instantané: {width}x{height}")
+        if len(data) != self.HEADER.size + area:
+            raise ValueError("Taille d'instantané incohérente")
+        if knight != self.NO_KNIGHT and (knight >= area
+                                         or data[self.HEADER.size + knight] != KNIGHT_PIECE):
+            raise ValueError(f"Position du cavalier incohérente: {knight}")
+        self._data = data
+    
+    @classmethod
+    def from_board(cls, width: int, height: int, board: bytes,
+                   knight_pos: Optional[Tuple[int, int]] = None) -> 'BoardSnapshot':
+        """
+        Construit un instantané à partir des cases (un octet par case).
+        
+        Raises:
+            ValueError: Si l'échiquier est trop grand (width * height >= NO_KNIGHT)
+                ou si le cavalier est hors de l'échiquier
+        """
+        if not (0 <= width and 0 <= height and width * height < cls.NO_KNIGHT):
+            raise ValueError(f"Échiquier trop grand pour un instantané: {width}x{height}")
+        if knight_pos is not None and not (0 <= knight_pos[0] < height
+                                           and 0 <= knight_pos[1] < width):
+            raise ValueError(f"Cavalier hors de l'échiquier: {knight_pos}")
+        knight = cls.NO_KNIGHT if knight_pos is None else knight_pos[0] * width + knight_pos[1]
+        return cls(cls.HEADER.pack(width, height, knight) + board)
+    
+    @classmethod
+    def from_pieces(cls, width: int, height: int, pieces) -> 'BoardSnapshot':
+        """
+        Construit un instantané depuis une liste de pièces au format de
+        puzzles.json : [[row, col, piece], ...].
+        
+        Comme pour Engine.set_piece, les pièces inconnues ou hors de
+        l'échiquier sont ignorées et le cavalier est retiré si une autre
+        pièce prend sa place.
+        """
+        board = bytearray(b'.' * (width * height))
+        knight_pos = None
+        for row, col, piece in pieces:
+            if piece not in PIECES or not (0 <= row < height and 0 <= col < width):
+                continue
+            board[row * width + col] = ord(piece)
+            if piece == 'K':
+                knight_pos = (row, col)
+            elif knight_pos == (row, col):
+                knight_pos = None
+        return cls.from_board(width, height, board, knight_pos)
+    
+    @property
+    def width(self) -> int:
+        return self.HEADER.unpack_from(self._data)[0]
+    
+    @property
+    def height(self) -> int:
+        return self.HEADER.unpack_from(self._data)[1]
+    
+    @property
+    def board(self) -> memoryview:
+        """Cases de l'échiquier, ligne par ligne (un octet par case), sans copie."""
+        return memoryview(self._data)[self.HEADER.size:]
+    
+    @property
+    def knight_pos(self) -> Optional[Tuple[int, int]]:
+        width, _, knight = self.HEADER.unpack_from(self._data)
+        if knight == self.NO_KNIGHT:
+            return None
+        return divmod(knight, width)
+    
+    @property
+    def target_positions(self) -> List[Tuple[int, int]]:
+        """Positions des pions noirs, dans l'ordre des cases."""
+        width = self.width
+        offset = self.HEADER.size
+        data = self._data
+        positions = []
+        index = data.find(b'p', offset)
+        while index != -1:
+            positions.append(divmod(index - offset, width))
+            index = data.find(b'p', index + 1)
+        return positions
+    
+    def get_piece(self, row: int, col: int) -> Optional[str]:
+        """Retourne la pièce à la position donnée."""
+        width, height, _ = self.HEADER.unpack_from(self._data)
+        if 0 <= row < height and 0 <= col < width:
+            return chr(self._data[self.HEADER.size + row * width + col])
+        return None
+    
+    def to_pieces(self) -> List[List]:
+        """Retourne la liste des pièces au format de puzzles.json."""
+        width = self.width
+        offset = self.HEADER.size
+        data = self._data
+        return [[*divmod(index - offset, width), chr(data[index])]
+                for index in range(offset, len(data)) if data[index] != EMPTY]
+    
+    def to_bytes(self) -> bytes:
+        """Retourne le contenu brut de l'instantané."""
+        return self._data
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BoardSnapshot):
+            return NotImplemented
+        return self._data == other._data
+    
+    def __hash__(self) -> int:
+        return hash(self._data)
+    
+    def __setattr__(self, name, value):
+        if hasattr(self, '_data'):
+            raise AttributeError("BoardSnapshot est immuable")
+        object.__setattr__(self, name, value)
+    
+    def __repr__(self) -> str:
+        return f"BoardSnapshot({self.width}x{self.height}, {bytes(self.board).decode('ascii')!r})"
+
 
 class Engine:
     """
@@ -13,35 +248,47 @@ class Engine:
     - '.' : Case vide
     """
     
-    def __init__(self, width: int = 8, height: int = 8):
+    def __init__(self, width: int = 8, height: int = 8,
+                 moves: Optional[Iterable[Tuple[int, int]]] = None):
         """
         Initialise l'échiquier.
         
         Args:
             width: Largeur de l'échiquier
             height: Hauteur de l'échiquier
+            moves: Déplacements (dr, dc) de la pièce (par défaut: le cavalier)
         """
         self.width = width
         self.height = height
-        self.board = [['.' for _ in range(width)] for _ in range(height)]
+        # Cases ligne par ligne, un octet ASCII par case (indice row * width + col)
+        self.board = bytearray(b'.' * (width * height))
         self.knight_pos = None
         self.target_positions = [] #liste des pions noirs
         self.move_count = 0
         self.move_history = []
         
-        # Mouvements possibles du cavalier (déplacements en L)
-        self.knight_moves = [
-            (-2, -1), (-2, 1), (-1, -2), (-1, 2),
-            (1, -2), (1, 2), (2, -1), (2, 1)
-        ]
+        # Mouvements possibles du cavalier (déplacements en L par défaut)
+        self.set_moves(moves if moves is not None else KNIGHT_MOVES)
+    
+    def set_moves(self, moves: Iterable[Tuple[int, int]]):
+        """
+        Change le jeu de déplacements de la pièce.
+        
+        Args:
+            moves: Déplacements (dr, dc), par exemple leaper_moves(CAMEL)
+        """
+        self.knight_moves = tuple(tuple(move) for move in moves)
+        self.move_table = compile_move_table(self.width, self.height, self.knight_moves)
     
     def reset_board(self):
         """Remet l'échiquier à zéro."""
-        self.board = [['.' for _ in range(self.width)] for _ in range(self.height)]
+        self.board = bytearray(b'.' * (self.width * self.height))
         self.knight_pos = None
         self.target_positions = []
         self.move_count = 0
         self.move_history = []
+        # La taille a pu changer : recharger la table des voisins
+        self.move_table = compile_move_table(self.width, self.height, self.knight_moves)
     
     def set_piece(self, row: int, col: int, piece: str) -> bool:
         """
@@ -55,18 +302,20 @@ class Engine:
         Returns:
             True si la pièce a été placée avec succès
         """
-        if not self.is_valid_position(row, col):
+        if piece not in PIECES or not self.is_valid_position(row, col):
             return False
         
+        index = row * self.width + col
+        
         # Si on retire le cavalier
-        if self.board[row][col] == 'K' and piece != 'K':
+        if self.board[index] == KNIGHT_PIECE and piece != 'K':
             self.knight_pos = None
         
         # Si on retire un pion noir
-        if self.board[row][col] == 'p' and piece != 'p':
+        if self.board[index] == TARGET and piece != 'p':
             self.target_positions = [(r, c) for r, c in self.target_positions if (r, c) != (row, col)]
         
-        self.board[row][col] = piece
+        self.board[index] = ord(piece)
         
         # Mise à jour des positions spéciales
         if piece == 'K':
@@ -80,7 +329,7 @@ class Engine:
     def get_piece(self, row: int, col: int) -> Optional[str]:
         """Retourne la pièce à la position donnée."""
         if self.is_valid_position(row, col):
-            return self.board[row][col]
+            return chr(self.board[row * self.width + col])
         return None
     
     def is_valid_position(self, row: int, col: int) -> bool:
@@ -92,9 +341,9 @@ class Engine:
         if not self.is_valid_position(row, col):
             return False
         
-        piece = self.board[row][col]
+        piece = self.board[row * self.width + col]
         # Le cavalier peut aller sur une case vide ou manger un pion noir
-        return piece == '.' or piece == 'p'
+        return piece == EMPTY or piece == TARGET
     
     def get_possible_moves(self, from_pos: Tuple[int, int] = None) -> List[Tuple[int, int]]:
         """
@@ -112,13 +361,18 @@ class Engine:
         if from_pos is None:
             return []
         
-        possible_moves = []
         row, col = from_pos
+        if not self.is_valid_position(row, col):
+            return []
         
-        for dr, dc in self.knight_moves:
-            new_row, new_col = row + dr, col + dc
-            if self.can_move_to(new_row, new_col):
-                possible_moves.append((new_row, new_col))
+        possible_moves = []
+        width = self.width
+        board = self.board
+        
+        for index in self.move_table[row * width + col]:
+            piece = board[index]
+            if piece == EMPTY or piece == TARGET:
+                possible_moves.append(divmod(index, width))
         
         return possible_moves
     
@@ -141,11 +395,11 @@ class Engine:
             return False
         
         from_row, from_col = self.knight_pos
-        captured_piece = self.board[to_row][to_col]
+        captured_piece = self.get_piece(to_row, to_col)
         
         # Effectuer le mouvement
-        self.board[from_row][from_col] = '.'
-        self.board[to_row][to_col] = 'K'
+        self.board[from_row * self.width + from_col] = EMPTY
+        self.board[to_row * self.width + to_col] = KNIGHT_PIECE
         self.knight_pos = (to_row, to_col)
         
         # Mise à jour de l'historique
@@ -180,8 +434,8 @@ class Engine:
         captured_piece = last_move['captured']
         
         # Restaurer les positions
-        self.board[from_pos[0]][from_pos[1]] = 'K'
-        self.board[to_pos[0]][to_pos[1]] = captured_piece
+        self.board[from_pos[0] * self.width + from_pos[1]] = KNIGHT_PIECE
+        self.board[to_pos[0] * self.width + to_pos[1]] = ord(captured_piece)
         self.knight_pos = from_pos
         self.move_count -= 1
         
@@ -202,25 +456,35 @@ class Engine:
         if self.knight_pos is None or not self.target_positions:
             return None
         
-        start = self.knight_pos
-        targets = set(self.target_positions)
+        width = self.width
+        board = self.board
+        table = self.move_table
+        start = self.knight_pos[0] * width + self.knight_pos[1]
+        targets = {row * width + col for row, col in self.target_positions}
         
-        # BFS
-        queue = deque([(start, [])])
-        visited = {start}
+        # BFS sur les indices de cases, avec le prédécesseur de chaque case visitée
+        parent = {start: None}
+        queue = deque([start])
         
         while queue:
-            current_pos, path = queue.popleft()
+            current = queue.popleft()
             
-            # Si on atteint une cible
-            if current_pos in targets:
-                return path + [current_pos]
+            # Si on atteint une cible, remonter le chemin
+            if current in targets:
+                path = []
+                while current is not None:
+                    path.append(divmod(current, width))
+                    current = parent[current]
+                path.reverse()
+                return path
             
             # Explorer les mouvements possibles
-            for next_pos in self.get_possible_moves(current_pos):
-                if next_pos not in visited:
-                    visited.add(next_pos)
-                    queue.append((next_pos, path + [current_pos]))
+            for index in table[current]:
+                if index not in parent:
+                    piece = board[index]
+                    if piece == EMPTY or piece == TARGET:
+                        parent[index] = current
+                        queue.append(index)
         
         return None
     
@@ -241,9 +505,32 @@ class Engine:
         """Vérifie si le jeu est gagné (tous les pions noirs mangés)."""
         return len(self.target_positions) == 0
     
-    def get_board_state(self) -> List[List[str]]:
-        """Retourne une copie de l'état actuel de l'échiquier."""
-        return copy.deepcopy(self.board)
+    def get_board_state(self) -> BoardSnapshot:
+        """Retourne un instantané immuable de l'état actuel de l'échiquier."""
+        return BoardSnapshot.from_board(self.width, self.height, self.board, self.knight_pos)
+    
+    def restore_board_state(self, snapshot: BoardSnapshot):
+        """
+        Restaure l'échiquier depuis un instantané (copie en bloc des cases).
+        
+        L'historique des coups est remis à zéro.
+        
+        Args:
+            snapshot: Instantané obtenu par get_board_state
+        """
+        width, height = snapshot.width, snapshot.height
+        if (width, height) == (self.width, self.height):
+            self.board[:] = snapshot.board
+        else:
+            self.width = width
+            self.height = height
+            self.move_table = compile_move_table(width, height, self.knight_moves)
+            self.board = bytearray(snapshot.board)
+        
+        self.knight_pos = snapshot.knight_pos
+        self.target_positions = snapshot.target_positions
+        self.move_count = 0
+        self.move_history = []
     
     def display_board(self) -> str:
         """
@@ -256,7 +543,8 @@ class Engine:
         result.append("  " + " ".join(str(i) for i in range(self.width)))
         result.append("  " + "-" * (self.width * 2 - 1))
         
-        for i, row in enumerate(self.board):
+        for i in range(self.height):
+            row = self.board[i * self.width:(i + 1) * self.width].decode('ascii')
             result.append(f"{i}| " + " ".join(row))
         
         result.append(f"\nCavalier en: {self.knight_pos}")
@@ -1,4 +1,4 @@
-from .engine import Engine
+from .engine import Engine, KNIGHT_MOVES, puzzle_moves
 from pathlib import Path
 import tkinter as tk
 import json
@@ -15,6 +15,7 @@ STATE_WON = 2
 SIDE = 40
 
 # Format: (largeur, hauteur, [(row, col, piece), ...])
+# Clé optionnelle "leapers": [[a, b], ...] pour une pièce autre que le cavalier
 DEFAULT_PUZZLE = [
     {
 	"width": 4,
@@ -246,9 +247,17 @@ class Menu(tk.Frame):
             puzzle = self.puzzles[self.level_nb]
             width, height, pieces = puzzle["width"], puzzle["height"], puzzle["pieces"]
             
+            # Pièce du puzzle : liste de sauteurs (a, b), le cavalier par défaut
+            try:
+                moves = puzzle_moves(puzzle)
+            except ValueError as e:
+                print(f"Erreur dans le niveau {self.level_nb + 1}: {e}")
+                moves = KNIGHT_MOVES
+            
             # Réinitialiser l'engine avec la nouvelle taille
             self.engine.width = width
             self.engine.height = height
+            self.engine.set_moves(moves)
             self.engine.reset_board()
             
             # Placer les pièces